@@ -1,10 +1,21 @@
 
-import streamlit as st, tempfile, json, os
-from validator import AgreementValidator
+import streamlit as st, tempfile, os, shutil
 
 st.set_page_config(page_title="Agreement Validation — B2C", layout="wide")
 st.title("Agreement Validation — B2C")
 
+# One validator per config.yaml version: editing the file (new mtime) builds a fresh one.
+@st.cache_resource(max_entries=1)
+def _get_validator(config_mtime):
+    from validator import AgreementValidator
+    return AgreementValidator()
+
+def _config_mtime():
+    try:
+        return os.path.getmtime("config.yaml")
+    except OSError:
+        return None
+
 col1,col2=st.columns(2)
 with col1:
     main=st.file_uploader("Main Agreement (PDF)",type=["pdf"])
@@ -19,17 +30,17 @@ if st.button("Run Validation"):
         st.error("Upload both Main & Client PDFs.")
     else:
         with tempfile.NamedTemporaryFile(delete=False,suffix=".pdf") as f:
-            f.write(main.read()); main_p=f.name
+            shutil.copyfileobj(main,f,length=1024*1024); main_p=f.name
         with tempfile.NamedTemporaryFile(delete=False,suffix=".pdf") as f:
-            f.write(client.read()); client_p=f.name
+            shutil.copyfileobj(client,f,length=1024*1024); client_p=f.name
 
         doc_paths=[]; doc_names=[]
         if docs:
             for d in docs:
                 with tempfile.NamedTemporaryFile(delete=False,suffix=".pdf") as f:
-                    f.write(d.read()); doc_paths.append(f.name); doc_names.append(d.name)
+                    shutil.copyfileobj(d,f,length=1024*1024); doc_paths.append(f.name); doc_names.append(d.name)
 
-        val=AgreementValidator()
+        val=_get_validator(_config_mtime())
         with st.spinner("Validating..."):
             out=val.validate(main_p,client_p,documents=doc_paths,document_names=doc_names)
 
@@ -50,4 +61,5 @@ if st.button("Run Validation"):
         st.subheader("Documents")
         st.write(out["documents"])
 
+        import json
         st.download_button("Download JSON",json.dumps(out,indent=2),"validation.json")
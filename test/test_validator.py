@@ -0,0 +1,233 @@
+import os
+import random
+import re
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pytest
+
+import validator as validator_module
+from validator import AgreementValidator, _build_automaton, _unique_matches, clause_similarity, simple_diff
+
+
+@pytest.fixture
+def validator():
+    return AgreementValidator(config_path="does-not-exist.yaml")
+
+
+class _StubAutomaton:
+    """Minimal stand-in for ahocorasick.Automaton.iter: yields (end_index, keyword)."""
+
+    def __init__(self, keywords):
+        self.keywords = keywords
+
+    def iter(self, text):
+        for k in self.keywords:
+            start = text.find(k)
+            while start != -1:
+                yield start + len(k) - 1, k
+                start = text.find(k, start + 1)
+
+
+def test_keyword_check_without_automaton(validator):
+    text = "This Rate Card and the PRICE LIST apply."
+    assert validator._keyword_check(text, validator.ratecard_keywords) == ["rate card", "price list"]
+    assert validator._keyword_check("", validator.ratecard_keywords) == []
+
+
+def test_keyword_check_with_automaton_keeps_config_order(validator):
+    keywords = validator.ratecard_keywords
+    text = "price list first, then rate-card and rate card"
+    expected = validator._keyword_check(text, keywords)
+    assert validator._keyword_check(text, keywords, _StubAutomaton(keywords)) == expected
+    assert expected == ["rate card", "rate-card", "price list"]
+
+
+def test_keyword_check_with_real_automaton(validator):
+    pytest.importorskip("ahocorasick")
+    keywords = validator.coi_keywords
+    automaton = _build_automaton(keywords)
+    text = "Copy of the Certificate of Incorporation attached."
+    assert validator._keyword_check(text, keywords, automaton) == validator._keyword_check(text, keywords)
+
+
+@pytest.mark.parametrize("pattern", [r"x(\d)?", r"(x)(\d)?y", r"x\d", r"\b([A-Z]{5}[0-9]{4}[A-Z])\b"])
+def test_unique_matches_is_deduplicated_findall(pattern):
+    regex = re.compile(pattern)
+    rng = random.Random(1)
+    for _ in range(200):
+        text = "".join(rng.choice("xy12 ABCDE1234F") for _ in range(40))
+        assert _unique_matches(regex, text) == list(dict.fromkeys(regex.findall(text)))
+
+
+def test_search_pan_gst_dedups_in_order(validator):
+    text = "PAN ABCDE1234F, GST 27ABCDE1234F1Z5, again ABCDE1234F and PQRST6789Z"
+    assert validator._search_pan_gst(text) == (["ABCDE1234F", "PQRST6789Z"], ["27ABCDE1234F1Z5"])
+
+
+WORDS = "the party shall pay rate card service agreement client vendor fee days notice term a of".split()
+
+
+def _random_line(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25)))
+
+
+def _brute_force(main_lines, client_lines):
+    out = []
+    for m in main_lines:
+        best = 0.0
+        best_line = None
+        for c in client_lines:
+            sim = clause_similarity(m, c)
+            if sim > best:
+                best = sim
+                best_line = c
+        out.append({"main": m, "best_match": best_line, "score": best})
+    return out
+
+
+def test_clause_similarities_matches_brute_force(validator):
+    rng = random.Random(0)
+    for _ in range(30):
+        main_lines = [_random_line(rng) for _ in range(20)]
+        client_lines = [_random_line(rng) for _ in range(40)]
+        assert validator._clause_similarities(main_lines, client_lines) == _brute_force(main_lines, client_lines)
+
+
+def test_clause_similarities_no_client_lines(validator):
+    assert validator._clause_similarities(["a b"], []) == [{"main": "a b", "best_match": None, "score": 0.0}]
+
+
+def test_simple_diff_identical():
+    assert simple_diff("same text", "same text") == {"added": [], "removed": []}
+
+
+@pytest.mark.parametrize("a, b", [
+    ("hello world", "XXhello world"),
+    ("hello world", "hello XXworld"),
+    ("hello world", "hello worldXX"),
+])
+def test_simple_diff_pure_insertion_and_deletion(a, b):
+    assert simple_diff(a, b) == {"added": ["XX"], "removed": []}
+    assert simple_diff(b, a) == {"added": [], "removed": ["XX"]}
+
+
+def test_simple_diff_prefix_overlapping_suffix():
+    assert simple_diff("aaa", "aa") == {"added": [], "removed": ["a"]}
+    assert simple_diff("aa", "aaa") == {"added": ["a"], "removed": []}
+    assert simple_diff("abab", "ab") == {"added": [], "removed": ["ab"]}
+
+
+def test_simple_diff_none_inputs():
+    assert simple_diff(None, None) == {"added": [], "removed": []}
+    assert simple_diff(None, "x") == {"added": ["x"], "removed": []}
+    assert simple_diff("x", None) == {"added": [], "removed": ["x"]}
+
+
+def test_simple_diff_reports_insertion_in_long_text():
+    # At this length SequenceMatcher's autojunk treats every common character as
+    # junk, so diffing the full texts used to report no change at all.
+    rng = random.Random(2)
+    text = " ".join(rng.choice(WORDS) for _ in range(20000))
+    edited = text[:50000] + "NEW CLAUSE" + text[50000:]
+    assert simple_diff(text, edited) == {"added": ["NEW CLAUSE"], "removed": []}
+
+
+class _InlinePool:
+    """Runs submitted calls immediately in-process, so a monkeypatched extract_text is used."""
+
+    def submit(self, fn, *args):
+        fut = Future()
+        fut.set_result(fn(*args))
+        return fut
+
+
+@pytest.fixture
+def fake_extract(monkeypatch):
+    calls = []
+    result = {"text": "extracted text"}
+
+    def extract_text(path, dpi=150, cpus=None):
+        calls.append((path, dpi))
+        return result["text"]
+
+    monkeypatch.setattr(validator_module, "_text_cache", OrderedDict())
+    monkeypatch.setattr(validator_module, "_get_pool", lambda: _InlinePool())
+    monkeypatch.setattr(validator_module, "extract_text", extract_text)
+    return calls, result
+
+
+def test_text_cache_hits_on_same_bytes_different_path(validator, fake_extract, tmp_path):
+    calls, _ = fake_extract
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    first.write_bytes(b"%PDF same bytes")
+    second.write_bytes(b"%PDF same bytes")
+    assert validator._extract_and_scan([str(first)])[0][0] == "extracted text"
+    assert validator._extract_and_scan([str(second)])[0][0] == "extracted text"
+    assert len(calls) == 1
+
+
+def test_text_cache_misses_when_dpi_differs(validator, fake_extract, tmp_path):
+    calls, _ = fake_extract
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF bytes")
+    validator._extract_and_scan([str(pdf)])
+    validator.dpi = 300
+    validator._extract_and_scan([str(pdf)])
+    assert [dpi for _, dpi in calls] == [150, 300]
+
+
+def test_text_cache_never_stores_blank_text(validator, fake_extract, tmp_path):
+    calls, result = fake_extract
+    result["text"] = "  \n "
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF bytes")
+    assert validator._extract_and_scan([str(pdf)])[0][0] == ""
+    assert not validator_module._text_cache
+    validator._extract_and_scan([str(pdf)])
+    assert len(calls) == 2
+
+
+def test_text_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(validator_module, "_text_cache", OrderedDict())
+    size = validator_module._TEXT_CACHE_SIZE
+    for n in range(size):
+        validator_module._cache_put((f"h{n}", 150), f"text {n}")
+    assert validator_module._cache_get(("h0", 150)) == "text 0"  # now most recently used
+    validator_module._cache_put(("new", 150), "new text")
+    assert len(validator_module._text_cache) == size
+    assert validator_module._cache_get(("h1", 150)) is None
+    assert validator_module._cache_get(("h0", 150)) == "text 0"
+    assert validator_module._cache_get(("new", 150)) == "new text"
+
+
+def _write_config(path, body, mtime):
+    path.write_text(body, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_config_reread_when_mtime_changes(tmp_path):
+    config = tmp_path / "config.yaml"
+    _write_config(config, "dpi: 200\n", 1_000_000)
+    assert AgreementValidator(config_path=str(config)).dpi == 200
+    _write_config(config, "dpi: 300\n", 1_000_100)
+    assert AgreementValidator(config_path=str(config)).dpi == 300
+
+
+def test_config_non_mapping_top_level_is_ignored(tmp_path):
+    config = tmp_path / "config.yaml"
+    _write_config(config, "placeholder config\n", 1_000_000)
+    assert validator_module._load_config(str(config)) == {}
+    assert AgreementValidator(config_path=str(config)).cfg == AgreementValidator.DEFAULT_CONFIG
+
+
+def test_config_mutation_does_not_leak_between_instances(tmp_path):
+    config = tmp_path / "config.yaml"
+    _write_config(config, "coi_keywords:\n  - certificate of incorporation\n", 1_000_000)
+    first = AgreementValidator(config_path=str(config))
+    first.cfg["coi_keywords"].append("leaked")
+    assert AgreementValidator(config_path=str(config)).cfg["coi_keywords"] == ["certificate of incorporation"]
+
+    default = AgreementValidator(config_path="does-not-exist.yaml")
+    default.cfg["ratecard_keywords"].append("leaked")
+    assert "leaked" not in AgreementValidator.DEFAULT_CONFIG["ratecard_keywords"]
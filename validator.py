@@ -3,65 +3,231 @@ validator.py
 
 Lightweight, execution-safe Agreement Validation module.
 Provides:
-- extract_text_and_images(pdf_path) -> (text, pages)
+- extract_text(pdf_path, dpi=150) -> text
+- extract_images(pdf_path, dpi=150) -> pages
+- extract_text_and_images(pdf_path, need_images=False, dpi=150) -> (text, pages)
 - AgreementValidator(config_path='config.yaml').validate(main_pdf, client_pdf, documents=..., document_names=...) -> dict
 - simple_diff, fuzzy_ratio, clause_similarity helpers
 
-Optional libraries (pdfplumber, pdf2image, pytesseract) are used if installed.
+Optional libraries (pdfplumber, pdf2image, aiopytesseract/pytesseract, rapidfuzz) are used if installed.
+PDF, OCR, YAML and process-pool imports are deferred until first use, so importing
+the module for simple_diff/fuzzy_ratio stays cheap.
+Scanned pages are OCR'd concurrently; set OCR_CONCURRENCY to cap parallel Tesseract runs.
 """
 
 from __future__ import annotations
+import copy
+import functools
+import hashlib
+import io
+import os
 import re
-import yaml
+import threading
+from collections import OrderedDict
 from difflib import SequenceMatcher
-from typing import List, Tuple, Any, Dict
+from itertools import islice
+from typing import List, Tuple, Any, Dict, Optional
 
-__all__ = ["extract_text_and_images", "AgreementValidator", "simple_diff", "fuzzy_ratio", "clause_similarity"]
+__all__ = ["extract_text", "extract_images", "extract_text_and_images", "AgreementValidator", "simple_diff", "fuzzy_ratio", "clause_similarity"]
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz  # type: ignore
+except Exception:
+    _rf_fuzz = None
 
 # -------------------------
 # Helpers
 # -------------------------
 def simple_diff(a: str, b: str) -> Dict[str, List[str]]:
-    s = SequenceMatcher(None, a or "", b or "")
+    a = a or ""
+    b = b or ""
+    # A shared prefix/suffix can only be "equal"; diff just the differing middle.
+    head = len(os.path.commonprefix([a, b]))
+    tail = len(os.path.commonprefix([a[head:][::-1], b[head:][::-1]]))
+    a_mid = a[head:len(a) - tail]
+    b_mid = b[head:len(b) - tail]
+    s = SequenceMatcher(None, a_mid, b_mid)
     adds: List[str] = []
     removes: List[str] = []
     for tag, i1, i2, j1, j2 in s.get_opcodes():
         if tag == "insert":
-            adds.append((b or "")[j1:j2])
+            adds.append(b_mid[j1:j2])
         elif tag == "delete":
-            removes.append((a or "")[i1:i2])
+            removes.append(a_mid[i1:i2])
     return {"added": adds, "removed": removes}
 
+def _seq_ratio(a: str, b: str) -> float:
+    """Character similarity in [0, 1]: rapidfuzz's C++ Indel ratio if installed, else difflib."""
+    if _rf_fuzz is not None:
+        return _rf_fuzz.ratio(a, b) / 100.0
+    return SequenceMatcher(None, a, b).ratio()
+
+def _token_bitmasks(lines: List[str], vocab: Dict[str, int]) -> List[int]:
+    """Each line's token set as an int bitmask over `vocab` (new tokens are added to it)."""
+    masks = []
+    for line in lines:
+        bits = 0
+        for tok in (line or "").lower().split():
+            bits |= 1 << vocab.setdefault(tok, len(vocab))
+        masks.append(bits)
+    return masks
+
+_popcount = getattr(int, "bit_count", None) or (lambda x: bin(x).count("1"))
+
 def fuzzy_ratio(a: str, b: str) -> float:
     if not a and not b:
         return 1.0
     if not a or not b:
         return 0.0
-    a_tokens = set(a.lower().split())
-    b_tokens = set(b.lower().split())
+    a_tokens = frozenset(a.lower().split())
+    b_tokens = frozenset(b.lower().split())
     if not a_tokens or not b_tokens:
         return 0.0
-    inter = a_tokens.intersection(b_tokens)
-    union = a_tokens.union(b_tokens)
-    token_score = len(inter) / len(union)
-    seq = SequenceMatcher(None, a, b).ratio()
+    inter = len(a_tokens & b_tokens)
+    token_score = inter / (len(a_tokens) + len(b_tokens) - inter)
+    seq = _seq_ratio(a, b)
     return float(0.6 * token_score + 0.4 * seq)
 
 def clause_similarity(a: str, b: str) -> float:
     return fuzzy_ratio(a, b)
 
+def _nonblank_lines(text: str, limit: int) -> List[str]:
+    """First `limit` stripped, non-empty lines of `text`; lines past the limit are never stripped."""
+    stripped = (line.strip() for line in (text or "").splitlines())
+    return list(islice((line for line in stripped if line), limit))
+
+def _tfidf_best_matches(main_lines: List[str], client_lines: List[str]) -> Optional[List[Tuple[Optional[str], float]]]:
+    """
+    Best client line (and TF-IDF cosine score) for every main line, from a single
+    sparse matrix product. Returns None if scikit-learn is not installed.
+    """
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+    except Exception:
+        return None
+    if not main_lines or not client_lines:
+        return [(None, 0.0) for _ in main_lines]
+    try:
+        vec = TfidfVectorizer().fit(main_lines + client_lines)
+    except ValueError:
+        return None  # empty vocabulary
+    sims = (vec.transform(main_lines) @ vec.transform(client_lines).T).toarray()
+    best_idx = sims.argmax(axis=1)
+    best_score = sims.max(axis=1)
+    return [(client_lines[j], float(sc)) if sc > 0 else (None, 0.0) for j, sc in zip(best_idx, best_score)]
+
+def _unique_matches(regex: "re.Pattern[str]", text: str) -> List[Any]:
+    """Same items as regex.findall(text), streamed from finditer and de-duplicated in first-seen order."""
+    if regex.groups == 0:
+        items = (m.group(0) for m in regex.finditer(text))
+    elif regex.groups == 1:
+        items = (m.groups("")[0] for m in regex.finditer(text))
+    else:
+        items = (m.groups("") for m in regex.finditer(text))
+    return list(dict.fromkeys(items))
+
+def _build_automaton(keywords: List[str]) -> Any:
+    """
+    Aho-Corasick automaton matching all `keywords` in one scan.
+    Returns None if pyahocorasick is not installed (or a keyword is empty).
+    """
+    if not keywords or not all(keywords):
+        return None
+    try:
+        import ahocorasick  # type: ignore
+    except Exception:
+        return None
+    automaton = ahocorasick.Automaton()
+    for k in keywords:
+        automaton.add_word(k, k)
+    automaton.make_automaton()
+    return automaton
+
+# -------------------------
+# OCR (scanned PDFs)
+# -------------------------
+def _ocr_concurrency(cpus: int) -> int:
+    try:
+        return max(1, int(os.environ.get("OCR_CONCURRENCY", "")))
+    except ValueError:
+        return cpus
+
+def _pil_to_bytes(image: Any) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+async def _ocr_pages_async(pil_pages: List[Any], cpus: int) -> List[str]:
+    import asyncio
+    try:
+        import aiopytesseract  # type: ignore
+        ocr = lambda page: aiopytesseract.image_to_string(_pil_to_bytes(page))
+    except Exception:
+        import pytesseract  # type: ignore
+        ocr = lambda page: asyncio.to_thread(pytesseract.image_to_string, page)
+
+    sem = asyncio.Semaphore(_ocr_concurrency(cpus))
+
+    async def run(page: Any) -> str:
+        async with sem:
+            try:
+                return await ocr(page) or ""
+            except Exception:
+                return ""
+
+    return list(await asyncio.gather(*(run(p) for p in pil_pages)))
+
+def _ocr_pages(pil_pages: List[Any], cpus: int) -> List[str]:
+    """
+    OCR pages concurrently (each Tesseract run is its own subprocess), at most `cpus`
+    at a time unless OCR_CONCURRENCY says otherwise.
+    Returns one empty string per page if no Tesseract binding is installed.
+    """
+    import asyncio
+    try:
+        return asyncio.run(_ocr_pages_async(pil_pages, cpus))
+    except Exception:
+        return [""] * len(pil_pages)
+
 # -------------------------
 # Minimal PDF extractor
 # -------------------------
-def extract_text_and_images(pdf_path: str) -> Tuple[str, List[Any]]:
+def _cpu_budget(cpus: Optional[int]) -> int:
+    return max(1, cpus or os.cpu_count() or 1)
+
+def extract_images(pdf_path: str, dpi: int = 150, cpus: Optional[int] = None) -> List[Any]:
     """
-    Try pdfplumber + pdf2image. If not available, return empty text and empty pages list.
+    Rasterize every page with pdf2image at `dpi`, using up to `cpus` cores (default: all).
+    Returns an empty list if pdf2image is not installed or conversion fails.
     """
     try:
-        import pdfplumber  # type: ignore
         from pdf2image import convert_from_path  # type: ignore
     except Exception:
-        return "", []
+        return []
+    import tempfile
+
+    # pdftoppm writes pages to a scratch folder (instead of piping them through memory)
+    # and rasterizes with several threads; pages are loaded before the folder is removed.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            pil_pages = convert_from_path(
+                pdf_path,
+                dpi=dpi,
+                thread_count=max(1, _cpu_budget(cpus) - 1),
+                output_folder=tmpdir,
+            )
+            for page in pil_pages:
+                page.load()
+        except Exception:
+            pil_pages = []
+    return pil_pages
+
+def _page_texts(pdf_path: str) -> Optional[List[str]]:
+    """Text layer of each page via pdfplumber ([""] on error), or None if pdfplumber is not installed."""
+    try:
+        import pdfplumber  # type: ignore
+    except Exception:
+        return None
 
     texts: List[str] = []
     try:
@@ -70,14 +236,140 @@ def extract_text_and_images(pdf_path: str) -> Tuple[str, List[Any]]:
                 texts.append(page.extract_text() or "")
     except Exception:
         texts = [""]
+    return texts
 
-    try:
-        pil_pages = convert_from_path(pdf_path, dpi=200)
-    except Exception:
-        pil_pages = []
+def _needs_ocr(texts: List[str]) -> bool:
+    return sum(1 for t in texts if not t.strip()) * 2 > len(texts)
+
+def _ocr_blank_pages(texts: List[str], pil_pages: List[Any], cpus: int) -> None:
+    """Fill the blank entries of `texts` in place with OCR of the matching rasterized pages."""
+    if not pil_pages:
+        return
+    texts += [""] * (len(pil_pages) - len(texts))
+    blank = [i for i, t in enumerate(texts) if not t.strip() and i < len(pil_pages)]
+    for i, ocr_text in zip(blank, _ocr_pages([pil_pages[i] for i in blank], cpus)):
+        texts[i] = ocr_text
+
+def extract_text(pdf_path: str, dpi: int = 150, cpus: Optional[int] = None) -> str:
+    """
+    Try pdfplumber. If not available, return empty text.
+    When most pages have no text layer (scanned PDF), pages are rasterized at `dpi`
+    and the blank ones OCR'd; the images themselves are not returned. Rasterization
+    and OCR use up to `cpus` cores (default: all), so concurrent callers can split them.
+    """
+    texts = _page_texts(pdf_path)
+    if texts is None:
+        return ""
+    if _needs_ocr(texts):
+        _ocr_blank_pages(texts, extract_images(pdf_path, dpi, cpus), _cpu_budget(cpus))
+    return "\n\n".join(texts)
 
+def extract_text_and_images(pdf_path: str, need_images: bool = False, dpi: int = 150) -> Tuple[str, List[Any]]:
+    """
+    Combined extract_text + extract_images. Pages are only returned when `need_images`
+    is set (otherwise the pages list is empty); they are rasterized once and reused for OCR.
+    """
+    if not need_images:
+        return extract_text(pdf_path, dpi), []
+    pil_pages = extract_images(pdf_path, dpi)
+    texts = _page_texts(pdf_path)
+    if texts is None:
+        return "", pil_pages
+    if _needs_ocr(texts):
+        _ocr_blank_pages(texts, pil_pages, _cpu_budget(None))
     return "\n\n".join(texts), pil_pages
 
+# -------------------------
+# Extracted-text cache
+# -------------------------
+# Keyed by (sha1 of file bytes, dpi). Lives in the calling process, next to the
+# pool that fills it; cleared on process restart.
+_TEXT_CACHE_SIZE = 32
+_text_cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+_text_cache_lock = threading.Lock()
+
+def _file_sha1(path: str) -> Optional[str]:
+    try:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+    except OSError:
+        return None
+
+def _cache_get(key: Tuple[str, int]) -> Optional[str]:
+    with _text_cache_lock:
+        text = _text_cache.get(key)
+        if text is not None:
+            _text_cache.move_to_end(key)
+        return text
+
+def _cache_put(key: Tuple[str, int], text: str) -> None:
+    with _text_cache_lock:
+        _text_cache[key] = text
+        _text_cache.move_to_end(key)
+        while len(_text_cache) > _TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+
+# -------------------------
+# Extraction pool
+# -------------------------
+# One pool per process, created on first use and reused across validate() calls.
+# Workers come from a forkserver (spawn where unavailable), so a multi-threaded
+# host process such as the Streamlit server is never forked.
+_pool: Any = None
+_pool_lock = threading.Lock()
+
+def _init_worker() -> None:
+    # Pages are already OCR'd in parallel, so each Tesseract run started from a
+    # worker gets one OpenMP thread. Only the worker's environment is touched.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+def _get_pool() -> Any:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_init_worker,
+            )
+        return _pool
+
+def _discard_pool(pool: Any) -> None:
+    """Forget a broken pool (e.g. a worker was killed) so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+# -------------------------
+# Config
+# -------------------------
+@functools.lru_cache(maxsize=4)
+def _load_config_file(config_path: str, mtime: float) -> Dict[str, Any]:
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader  # libyaml-backed
+    except ImportError:
+        from yaml import SafeLoader as Loader
+    with open(config_path, "r", encoding="utf-8") as f:
+        cfg = yaml.load(f, Loader=Loader)
+    return cfg if isinstance(cfg, dict) else {}
+
+def _load_config(config_path: str) -> Dict[str, Any]:
+    """Parsed config mapping, re-read only when the file's mtime changes; {} if missing or invalid."""
+    try:
+        # Deep copy: callers mutate nested lists, which must not leak into the lru_cache.
+        return copy.deepcopy(_load_config_file(config_path, os.path.getmtime(config_path)))
+    except Exception:
+        return {}
+
 # -------------------------
 # AgreementValidator
 # -------------------------
@@ -88,107 +380,180 @@ class AgreementValidator:
         "coi_keywords": ["certificate of incorporation", "incorporation certificate"],
         "ratecard_keywords": ["rate card", "rate-card", "price list"],
         "similarity_threshold": 0.75,
+        "dpi": 150,
+        "similarity_method": "fuzzy",  # or "tfidf" (needs scikit-learn)
     }
 
     def __init__(self, config_path: str = "config.yaml") -> None:
-        cfg = {}
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                cfg = yaml.safe_load(f) or {}
-        except Exception:
-            cfg = {}
+        cfg = _load_config(config_path)
 
-        merged = dict(AgreementValidator.DEFAULT_CONFIG)
+        merged = copy.deepcopy(AgreementValidator.DEFAULT_CONFIG)
         merged.update(cfg)
         self.cfg = merged
 
-        pan_pattern = self.cfg.get("pan_regex") or r""
-        gst_pattern = self.cfg.get("gst_regex") or r""
-        try:
-            self.pan_re = re.compile(pan_pattern)
-        except re.error:
-            self.pan_re = re.compile(AgreementValidator.DEFAULT_CONFIG["pan_regex"])
-        try:
-            self.gst_re = re.compile(gst_pattern)
-        except re.error:
-            self.gst_re = re.compile(AgreementValidator.DEFAULT_CONFIG["gst_regex"])
-
         self.coi_keywords = [k.lower() for k in self.cfg.get("coi_keywords", [])]
         self.ratecard_keywords = [k.lower() for k in self.cfg.get("ratecard_keywords", [])]
         self.sim_threshold = float(self.cfg.get("similarity_threshold", 0.75))
+        self.dpi = int(self.cfg.get("dpi", 150))
+        self.sim_method = str(self.cfg.get("similarity_method", "fuzzy")).lower()
 
-    def _search_pan_gst(self, text: str) -> Tuple[List[str], List[str]]:
-        if not text:
-            return [], []
-        pan = self.pan_re.findall(text)
-        gst = self.gst_re.findall(text)
-        return pan, gst
-
-    def _keyword_check(self, text: str, keywords: List[str]) -> List[str]:
-        t = (text or "").lower()
-        return [k for k in keywords if k in t]
+    # Matchers are compiled on first use (then kept), so an instance that is
+    # built once and reused never pays for them twice.
+    def _compile(self, key: str) -> "re.Pattern[str]":
+        try:
+            return re.compile(self.cfg.get(key) or r"")
+        except re.error:
+            return re.compile(AgreementValidator.DEFAULT_CONFIG[key])
 
-    def validate(self, main_pdf: str, client_pdf: str, documents: List[str] = None, document_names: List[str] = None) -> Dict[str, Any]:
-        main_text, main_pages = extract_text_and_images(main_pdf)
-        client_text, client_pages = extract_text_and_images(client_pdf)
+    @functools.cached_property
+    def pan_re(self) -> "re.Pattern[str]":
+        return self._compile("pan_regex")
 
-        if not (main_text and main_text.strip()):
-            main_text = ""
-        if not (client_text and client_text.strip()):
-            client_text = ""
+    @functools.cached_property
+    def gst_re(self) -> "re.Pattern[str]":
+        return self._compile("gst_regex")
 
-        pan_main, gst_main = self._search_pan_gst(main_text)
-        pan_client, gst_client = self._search_pan_gst(client_text)
+    @functools.cached_property
+    def _coi_ac(self) -> Any:
+        return _build_automaton(self.coi_keywords)
 
-        coi_main = self._keyword_check(main_text, self.coi_keywords)
-        coi_client = self._keyword_check(client_text, self.coi_keywords)
+    @functools.cached_property
+    def _rate_ac(self) -> Any:
+        return _build_automaton(self.ratecard_keywords)
 
-        rate_main = self._keyword_check(main_text, self.ratecard_keywords)
-        rate_client = self._keyword_check(client_text, self.ratecard_keywords)
+    def _search_pan_gst(self, text: str) -> Tuple[List[str], List[str]]:
+        if not text:
+            return [], []
+        pan = _unique_matches(self.pan_re, text)
+        gst = _unique_matches(self.gst_re, text)
+        return pan, gst
 
-        diff = simple_diff(main_text, client_text)
+    def _keyword_check(self, text: str, keywords: List[str], automaton: Any = None) -> List[str]:
+        t = (text or "").lower()
+        if automaton is None:
+            return [k for k in keywords if k in t]
+        found = {k for _, k in automaton.iter(t)}
+        return [k for k in keywords if k in found]
 
-        main_lines = [l.strip() for l in (main_text or "").splitlines() if l.strip()][:200]
-        client_lines = [l.strip() for l in (client_text or "").splitlines() if l.strip()][:200]
+    def _clause_similarities(self, main_lines: List[str], client_lines: List[str]) -> List[Dict[str, Any]]:
+        if self.sim_method == "tfidf":
+            matches = _tfidf_best_matches(main_lines, client_lines)
+            if matches is not None:
+                return [{"main": m, "best_match": c, "score": sc} for m, (c, sc) in zip(main_lines, matches)]
 
+        # Same 0.6 * token Jaccard + 0.4 * character ratio as fuzzy_ratio (lines are
+        # non-blank). Jaccard comes from two popcounts on token bitmasks; the character
+        # ratio is at most 2*min/(len_m+len_c), so pairs that cannot beat `best` skip it.
+        vocab: Dict[str, int] = {}
+        client_masks = _token_bitmasks(client_lines, vocab)
+        main_masks = _token_bitmasks(main_lines, vocab)
         similarities = []
-        for m in main_lines[:20]:
+        for m, m_mask in zip(main_lines, main_masks):
             best = 0.0
             best_line = None
-            for c in client_lines[:40]:
-                sim = clause_similarity(m, c)
+            for c, c_mask in zip(client_lines, client_masks):
+                union = _popcount(m_mask | c_mask)
+                if not union:
+                    continue
+                token_score = _popcount(m_mask & c_mask) / union
+                lo, hi = sorted((len(m), len(c)))
+                if 0.6 * token_score + 0.4 * 2 * lo / (lo + hi) < best:
+                    continue
+                sim = float(0.6 * token_score + 0.4 * _seq_ratio(m, c))
                 if sim > best:
                     best = sim
                     best_line = c
             similarities.append({"main": m, "best_match": best_line, "score": best})
+        return similarities
+
+    def _scan(self, text: str) -> Dict[str, List[str]]:
+        pan, gst = self._search_pan_gst(text)
+        return {
+            "pan": pan,
+            "gst": gst,
+            "coi_keywords": self._keyword_check(text, self.coi_keywords, self._coi_ac),
+            "rate_keywords": self._keyword_check(text, self.ratecard_keywords, self._rate_ac),
+        }
+
+    def _extract_and_scan(self, paths: List[str]) -> List[Tuple[str, Dict[str, List[str]]]]:
+        """
+        Extract text from every PDF concurrently in the shared process pool, and scan
+        each text (PAN/GST, keywords) as soon as it arrives while the others are still
+        being extracted. Files seen before (same bytes, same dpi) come from the text cache.
+        Results are returned in the same order as `paths`; a failed file yields "".
+        """
+        from concurrent.futures import as_completed
+        from concurrent.futures.process import BrokenProcessPool
+
+        keys = [(_file_sha1(p), self.dpi) for p in paths]
+        results: List[Any] = [None] * len(paths)
 
+        def finish(i: int, text: str) -> None:
+            if not (text and text.strip()):
+                text = ""
+            results[i] = (text, self._scan(text))
+
+        cached = {i: _cache_get(k) for i, k in enumerate(keys) if k[0]}
+        cached = {i: t for i, t in cached.items() if t is not None}
+        pending = [i for i in range(len(paths)) if i not in cached]
+
+        # Files extract side by side, so each gets an equal share of the cores for
+        # pdftoppm/Tesseract instead of every worker assuming the whole machine.
+        cpus = max(1, (os.cpu_count() or 1) // max(1, len(pending)))
+        futures: Dict[Any, int] = {}
+        pool = _get_pool() if pending else None
+        if pool is not None:
+            try:
+                futures = {pool.submit(extract_text, paths[i], self.dpi, cpus): i for i in pending}
+            except BrokenProcessPool:
+                _discard_pool(pool)
+                pool = _get_pool()
+                futures = {pool.submit(extract_text, paths[i], self.dpi, cpus): i for i in pending}
+        for i, text in cached.items():
+            finish(i, text)
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                text = fut.result()
+            except Exception as exc:
+                if isinstance(exc, BrokenProcessPool):
+                    _discard_pool(pool)
+                text = ""
+            else:
+                # Empty text may be a swallowed failure (missing library, OCR error);
+                # don't pin it to this file hash for the rest of the process.
+                if keys[i][0] and text.strip():
+                    _cache_put(keys[i], text)
+            finish(i, text)
+        return results
+
+    def validate(self, main_pdf: str, client_pdf: str, documents: List[str] = None, document_names: List[str] = None) -> Dict[str, Any]:
         documents = documents or []
         document_names = document_names or []
+        (main_text, main_scan), (client_text, client_scan), *doc_results = self._extract_and_scan(
+            [main_pdf, client_pdf, *documents]
+        )
+
+        diff = simple_diff(main_text, client_text)
+
+        main_lines = _nonblank_lines(main_text, 200)
+        client_lines = _nonblank_lines(client_text, 200)
+
+        similarities = self._clause_similarities(main_lines[:20], client_lines[:40])
+
         documents_summary = {}
-        for idx, doc_path in enumerate(documents):
+        for idx, (d_text, d_scan) in enumerate(doc_results):
             doc_name = document_names[idx] if idx < len(document_names) else f"document_{idx+1}.pdf"
-            try:
-                d_text, d_pages = extract_text_and_images(doc_path)
-                if not (d_text and d_text.strip()):
-                    d_text = ""
-            except Exception:
-                d_text = ""
-            pan_d, gst_d = self._search_pan_gst(d_text)
-            coi_d = self._keyword_check(d_text, self.coi_keywords)
-            rate_d = self._keyword_check(d_text, self.ratecard_keywords)
             documents_summary[doc_name] = {
-                "pan": pan_d,
-                "gst": gst_d,
-                "coi_keywords": coi_d,
-                "rate_keywords": rate_d,
+                **d_scan,
                 "text_snippet": (d_text or "")[:1000]
             }
 
         summary = {
-            "pan": {"main": pan_main, "client": pan_client},
-            "gst": {"main": gst_main, "client": gst_client},
-            "coi_keywords": {"main": coi_main, "client": coi_client},
-            "rate_keywords": {"main": rate_main, "client": rate_client},
+            "pan": {"main": main_scan["pan"], "client": client_scan["pan"]},
+            "gst": {"main": main_scan["gst"], "client": client_scan["gst"]},
+            "coi_keywords": {"main": main_scan["coi_keywords"], "client": client_scan["coi_keywords"]},
+            "rate_keywords": {"main": main_scan["rate_keywords"], "client": client_scan["rate_keywords"]},
             "diff": diff,
             "clause_similarity_samples": similarities,
             "documents": documents_summary,